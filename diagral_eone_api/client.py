@@ -2,34 +2,52 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import ssl
-from typing import Any
+import time
+from typing import Any, Awaitable, Callable, Dict, Set, Tuple
 
 from aiohttp import ClientConnectorError, ClientResponseError, ClientSession
 
-from .models import (ConnectResponse,
+from .models import (ConnectResponse, DrainResult,
                      GetConfigurationResponse, GetDevicesResponse,
                      GetSystemAlertsResponse, GetSystemsResponse,
                      GetSystemStateResponse, IsConnectedResponse,
                      LoginResponse, LogoutResponse)
 
-from .const import BASE_URL, HTTP_CALL_TIMEOUT
+from .const import (BASE_URL, DRAIN_CLOSE_TIMEOUT, DRAIN_MAX_PARALLEL,
+                    DRAIN_REQUEST_TIMEOUT, HTTP_CALL_TIMEOUT)
+from .dispatcher import Priority, RequestDispatcher
 from .exceptions import (AuthorizationError, BadRequestError,
-                        CloudConnectionError, DiagralCloudError,
-                        TooManyRequestsError)
+                        ClientClosingError, CloudConnectionError,
+                        DiagralCloudError, TooManyRequestsError)
 
 _LOGGER = logging.getLogger(__name__)
 
 class DiagralEOneApi:
     """Diagral e-one API class."""
 
-    def __init__(self, username: str, password: str, session: ClientSession | None) -> None:
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        session: ClientSession | None,
+        dispatcher: RequestDispatcher | None = None,
+    ) -> None:
         """Initialize the object."""
         self.base_url = BASE_URL
         self.session: ClientSession | None = session
         self.username = username
         self.password = password
+        self.dispatcher: RequestDispatcher | None = dispatcher
+        self.closing = False
+        self._in_flight: Set[asyncio.Task] = set()
+        self._aborted: Set[asyncio.Task] = set()
+        # Account session id to its expiry, on the monotonic clock.
+        self._account_sessions: Dict[str, float] = {}
+        # (system id, TTM session id) to the account session id it belongs to.
+        self._ttm_sessions: Dict[Tuple[int, str], str] = {}
 
     async def api_request(
         self,
@@ -37,6 +55,57 @@ class DiagralEOneApi:
         url: str,
         data: Any | None = None,
         bearer_token: str | None = None,
+        priority: Priority = Priority.INTERACTIVE,
+        cleanup: bool = False,
+    ):
+        """Make an API request, through the dispatcher if any.
+
+        Once the client is closing, only cleanup requests are accepted. An
+        account session is forgotten when a request using it is unauthorized.
+        """
+        if self.closing and not cleanup:
+            raise ClientClosingError("The client is closing and does not accept new requests.")
+
+        task = asyncio.ensure_future(
+            self._dispatch_request(method, url, data, bearer_token, priority)
+        )
+        self._in_flight.add(task)
+        try:
+            return await task
+        except asyncio.CancelledError:
+            if task in self._aborted:
+                raise ClientClosingError("The request was cancelled because the client is closing.") from None
+            raise
+        except AuthorizationError:
+            if bearer_token is not None:
+                self._forget_account_session(bearer_token)
+            raise
+        finally:
+            self._in_flight.discard(task)
+            self._aborted.discard(task)
+
+    async def _dispatch_request(
+        self,
+        method: str,
+        url: str,
+        data: Any | None,
+        bearer_token: str | None,
+        priority: Priority,
+    ):
+        """Make an API request, through the dispatcher if any."""
+        if self.dispatcher is None:
+            return await self._api_request(method, url, data, bearer_token)
+
+        return await self.dispatcher.run(
+            priority, lambda: self._api_request(method, url, data, bearer_token)
+        )
+
+    async def _api_request(
+        self,
+        method: str,
+        url: str,
+        data: Any | None = None,
+        bearer_token: str | None = None,
     ):
         """Make an API request."""
         if self.session is None:
@@ -44,14 +113,17 @@ class DiagralEOneApi:
         else:
             session = self.session
 
+        # The token is sent per request, the session may be shared by several accounts.
+        headers = {}
         if bearer_token is not None:
-            session.headers.add("Authorization", f"Bearer {bearer_token}")
+            headers["Authorization"] = f"Bearer {bearer_token}"
 
         try:
             async with session.request(
                 method,
                 url,
                 json=data,
+                headers=headers,
                 raise_for_status=True,
                 timeout=HTTP_CALL_TIMEOUT,
                 ssl=ssl.SSLContext()
@@ -83,7 +155,13 @@ class DiagralEOneApi:
 
         _LOGGER.debug("Login response: %s", response_json)
 
-        return LoginResponse.from_dict(response_json)
+        response = LoginResponse.from_dict(response_json)
+        self._forget_expired_sessions()
+        self._account_sessions[response.session_id] = (
+            time.monotonic() + response.expires_in_ms / 1000
+        )
+
+        return response
 
     async def get_systems(self, session_id: str) -> GetSystemsResponse:
         """Get user alarm systems."""
@@ -137,7 +215,10 @@ class DiagralEOneApi:
 
         _LOGGER.debug("Connect response: %s", response_json)
 
-        return ConnectResponse.from_dict(response_json)
+        response = ConnectResponse.from_dict(response_json)
+        self._ttm_sessions[(system_id, response.ttm_session_id)] = session_id
+
+        return response
 
     async def get_system_state(
         self, session_id: str, central_id: str, ttm_session_id: str
@@ -152,12 +233,16 @@ class DiagralEOneApi:
 
         return GetSystemStateResponse.from_dict(response_json)
 
-    async def get_devices(self, session_id: str, system_id: int, central_id: str, ttm_session_id: str):
+    async def get_devices(
+        self, session_id: str, system_id: int, central_id: str, ttm_session_id: str
+    ) -> GetDevicesResponse:
         """Retrieve all devices."""
         url = f"{self.base_url}/api/scenarios/{system_id}/devices"
         data = {"centralId": central_id, "ttmSessionId": ttm_session_id}
 
-        response_json = await self.api_request("get", url, data, bearer_token=session_id)
+        response_json = await self.api_request(
+            "get", url, data, bearer_token=session_id, priority=Priority.BACKGROUND
+        )
 
         _LOGGER.debug("GetDevices response: %s", response_json)
 
@@ -177,7 +262,9 @@ class DiagralEOneApi:
                 "system_id": system_id,
                 "ttmSessionId": ttm_session_id}
 
-        response_json = await self.api_request("post", url, data, bearer_token=session_id)
+        response_json = await self.api_request(
+            "post", url, data, bearer_token=session_id, priority=Priority.BACKGROUND
+        )
 
         _LOGGER.debug("GetSystemAlerts response: %s", response_json)
 
@@ -188,19 +275,132 @@ class DiagralEOneApi:
         url = f"{self.base_url}/authenticate/disconnect"
         data = { "systemId": system_id, "ttmSessionId": ttm_session_id }
 
-        response_json = await self.api_request("post", url, data, bearer_token=session_id)
+        response_json = await self.api_request(
+            "post", url, data, bearer_token=session_id, cleanup=True
+        )
 
         _LOGGER.debug("Disconnect response: %s", response_json)
 
-        return LogoutResponse.from_dict(response_json)
+        response = LogoutResponse.from_dict(response_json)
+        self._ttm_sessions.pop((system_id, ttm_session_id), None)
+
+        return response
     
     async def logout(self, session_id: str) -> LogoutResponse:
         """Logout from the user account."""
         url = f"{self.base_url}/authenticate/logout"
         data = {"systemId": "null"}
 
-        response_json = await self.api_request("post", url, data, bearer_token=session_id)
+        response_json = await self.api_request(
+            "post", url, data, bearer_token=session_id, cleanup=True
+        )
 
         _LOGGER.debug("Logout response: %s", response_json)
 
-        return LogoutResponse.from_dict(response_json)
+        response = LogoutResponse.from_dict(response_json)
+        self._forget_account_session(session_id)
+
+        return response
+
+    async def drain(
+        self,
+        request_timeout: float = DRAIN_REQUEST_TIMEOUT,
+        close_timeout: float = DRAIN_CLOSE_TIMEOUT,
+        max_parallel: int = DRAIN_MAX_PARALLEL,
+    ) -> DrainResult:
+        """Stop accepting requests and close all the open sessions.
+
+        In-flight requests are given request_timeout seconds to finish. The
+        ones still running are cancelled, so that nothing outlives the drain,
+        and their callers get ClientClosingError. Then every TTM session is
+        disconnected and every account logged out, at most max_parallel at a
+        time, within close_timeout seconds. Sessions found already expired or
+        unauthorized are considered closed.
+        """
+        self.closing = True
+        result = DrainResult()
+
+        if self._in_flight:
+            _, pending = await asyncio.wait(set(self._in_flight), timeout=request_timeout)
+            self._aborted.update(pending)
+            await self._cancel(pending)
+            result.cancelled_requests = len(pending)
+
+        self._forget_expired_sessions()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + close_timeout
+        semaphore = asyncio.Semaphore(max_parallel)
+
+        result.failed_ttm_sessions = await self._close_sessions(
+            {
+                key: (lambda key=key, session_id=session_id:
+                      self.disconnect(session_id, key[0], key[1]))
+                for key, session_id in self._ttm_sessions.items()
+            },
+            semaphore,
+            deadline - loop.time(),
+        )
+        result.failed_account_sessions = await self._close_sessions(
+            {
+                session_id: (lambda session_id=session_id: self.logout(session_id))
+                for session_id in self._account_sessions
+            },
+            semaphore,
+            deadline - loop.time(),
+        )
+
+        if not result.success:
+            _LOGGER.warning("Drain incomplete: %s", result)
+
+        return result
+
+    @staticmethod
+    async def _close_sessions(
+        closers: Dict[Any, Callable[[], Awaitable[Any]]],
+        semaphore: asyncio.Semaphore,
+        timeout: float,
+    ) -> Dict[Any, BaseException]:
+        """Run the closers concurrently, return the errors by session key."""
+        if not closers:
+            return {}
+
+        async def close(closer: Callable[[], Awaitable[Any]]) -> None:
+            async with semaphore:
+                await closer()
+
+        tasks = {key: asyncio.ensure_future(close(closer)) for key, closer in closers.items()}
+        _, pending = await asyncio.wait(list(tasks.values()), timeout=max(timeout, 0))
+        await DiagralEOneApi._cancel(pending)
+
+        failed: Dict[Any, BaseException] = {}
+        for key, task in tasks.items():
+            if task in pending:
+                failed[key] = asyncio.TimeoutError("Session was not closed before the deadline.")
+                continue
+            error = task.exception()
+            # An unauthorized session has already been closed by the API.
+            if error is not None and not isinstance(error, AuthorizationError):
+                failed[key] = error
+
+        return failed
+
+    @staticmethod
+    async def _cancel(tasks: Set[asyncio.Task]) -> None:
+        """Cancel the tasks and wait for them to finish."""
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _forget_account_session(self, session_id: str) -> None:
+        """Stop tracking an account session and its TTM sessions."""
+        self._account_sessions.pop(session_id, None)
+        for key in [key for key, owner in self._ttm_sessions.items() if owner == session_id]:
+            del self._ttm_sessions[key]
+
+    def _forget_expired_sessions(self) -> None:
+        """Stop tracking the account sessions past their expiry."""
+        now = time.monotonic()
+        for session_id, expiry in list(self._account_sessions.items()):
+            if expiry <= now:
+                self._forget_account_session(session_id)
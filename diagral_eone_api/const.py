@@ -32,3 +32,54 @@ CONNECTED_USER_TYPE = "connectedUserType"
 CODE_INDEX = "codeIndex"
 DEFAULTS = "defaults"
 COMMAND_STATUS = "commandStatus"
+
+DEVICE_TYPE_SENSOR: Final[str] = "SENSOR"
+DEVICE_TYPE_COMMAND: Final[str] = "COMMAND"
+
+CENTRAL_ALERT_FIELDS = (
+    "main_power_supply_alert",
+    "secondary_power_supply_alert",
+    "default_media_alert",
+    "autoprotection_mechanical_alert",
+    "autoprotection_wired_alert",
+    "radio_alert",
+)
+SENSOR_ALERT_FIELDS = (
+    "power_supply_alert",
+    "secondary_power_supply_alert",
+    "autoprotection_mechanical_alert",
+    "radio_alert",
+    "sensor_alert",
+    "loop_alert",
+    "mask_alert",
+    "ejected",
+)
+COMMAND_ALERT_FIELDS = (
+    "power_supply_alert",
+    "secondary_power_supply_alert",
+    "autoprotection_mechanical_alert",
+    "radio_alert",
+)
+TRANSMITTER_ALERT_FIELDS = (
+    "media_adsl_alert",
+    "media_gsm_alert",
+    "media_rtc_alert",
+    "out_of_order_alert",
+    "main_power_supply_alert",
+    "secondary_power_supply_alert",
+    "autoprotection_mechanical_alert",
+    "radio_alert",
+)
+
+DISPATCHER_MAX_CONCURRENCY: Final[int] = 4
+DISPATCHER_RESERVED_INTERACTIVE: Final[int] = 1
+DISPATCHER_INTERACTIVE_QUEUE_SIZE: Final[int] = 100
+DISPATCHER_BACKGROUND_QUEUE_SIZE: Final[int] = 20
+
+HISTORY_CAPACITY: Final[int] = 1024
+HISTORY_ARCHIVE_CAPACITY: Final[int] = 1024
+HISTORY_DOWNSAMPLE_FACTOR: Final[int] = 16
+
+DRAIN_REQUEST_TIMEOUT: Final[float] = 10
+DRAIN_CLOSE_TIMEOUT: Final[float] = 15
+DRAIN_MAX_PARALLEL: Final[int] = 8
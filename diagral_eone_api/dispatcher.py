@@ -0,0 +1,154 @@
+"""Priority-aware dispatcher for the Diagral e-one API requests."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, replace
+from enum import IntEnum
+from typing import Awaitable, Callable, Deque, Dict, TypeVar
+
+from .const import (DISPATCHER_BACKGROUND_QUEUE_SIZE,
+                    DISPATCHER_INTERACTIVE_QUEUE_SIZE,
+                    DISPATCHER_MAX_CONCURRENCY,
+                    DISPATCHER_RESERVED_INTERACTIVE)
+from .exceptions import DispatcherOverloadedError
+
+_T = TypeVar("_T")
+
+
+class Priority(IntEnum):
+    """Request priority classes, lower value is served first."""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+@dataclass
+class PriorityMetrics:
+    """Describe the dispatcher metrics of a priority class."""
+    queue_depth: int = 0
+    dispatched: int = 0
+    shed: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def average_wait(self) -> float:
+        """Return the average time spent in queue, in seconds."""
+        return self.total_wait / self.dispatched if self.dispatched else 0.0
+
+
+class RequestDispatcher:
+    """Run requests with bounded concurrency, serving interactive calls first.
+
+    Background requests can only use the slots that are not reserved for
+    interactive requests. When a priority class queue is full, new requests
+    of that class are rejected with DispatcherOverloadedError.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DISPATCHER_MAX_CONCURRENCY,
+        reserved_interactive: int = DISPATCHER_RESERVED_INTERACTIVE,
+        interactive_queue_size: int = DISPATCHER_INTERACTIVE_QUEUE_SIZE,
+        background_queue_size: int = DISPATCHER_BACKGROUND_QUEUE_SIZE,
+    ) -> None:
+        """Initialize the object."""
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        if not 0 <= reserved_interactive < max_concurrency:
+            raise ValueError("reserved_interactive must be between 0 and max_concurrency - 1.")
+
+        self.max_concurrency = max_concurrency
+        self.reserved_interactive = reserved_interactive
+        self._queue_sizes: Dict[Priority, int] = {
+            Priority.INTERACTIVE: interactive_queue_size,
+            Priority.BACKGROUND: background_queue_size,
+        }
+        self._queues: Dict[Priority, Deque[asyncio.Future]] = {
+            priority: deque() for priority in Priority
+        }
+        self._metrics: Dict[Priority, PriorityMetrics] = {
+            priority: PriorityMetrics() for priority in Priority
+        }
+        self._active = 0
+
+    @property
+    def active(self) -> int:
+        """Return the number of requests currently running."""
+        return self._active
+
+    def metrics(self) -> Dict[Priority, PriorityMetrics]:
+        """Return a snapshot of the metrics for each priority class."""
+        return {priority: replace(metrics) for priority, metrics in self._metrics.items()}
+
+    async def run(self, priority: Priority, func: Callable[[], Awaitable[_T]]) -> _T:
+        """Wait for a slot of the given priority, then await the request."""
+        await self._acquire(priority)
+        try:
+            return await func()
+        finally:
+            self._release()
+
+    def _limit(self, priority: Priority) -> int:
+        """Return the number of slots usable by a priority class."""
+        if priority == Priority.INTERACTIVE:
+            return self.max_concurrency
+        return self.max_concurrency - self.reserved_interactive
+
+    def _has_waiters(self, priority: Priority) -> bool:
+        """Return True if requests of this or a higher priority are queued."""
+        return any(self._queues[other] for other in Priority if other <= priority)
+
+    async def _acquire(self, priority: Priority) -> None:
+        """Take a slot, queueing the caller if none is available."""
+        metrics = self._metrics[priority]
+
+        if self._active < self._limit(priority) and not self._has_waiters(priority):
+            self._active += 1
+            metrics.dispatched += 1
+            return
+
+        queue = self._queues[priority]
+        if len(queue) >= self._queue_sizes[priority]:
+            metrics.shed += 1
+            raise DispatcherOverloadedError(
+                f"Too many {priority.name.lower()} requests queued ({len(queue)})."
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        metrics.queue_depth = len(queue)
+        started = time.monotonic()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over before the cancellation.
+                self._release()
+            else:
+                try:
+                    queue.remove(waiter)
+                except ValueError:
+                    pass
+                metrics.queue_depth = len(queue)
+            raise
+
+        waited = time.monotonic() - started
+        metrics.dispatched += 1
+        metrics.total_wait += waited
+        metrics.max_wait = max(metrics.max_wait, waited)
+
+    def _release(self) -> None:
+        """Free a slot and hand it over to the highest priority waiter."""
+        self._active -= 1
+        for priority in Priority:
+            queue = self._queues[priority]
+            while queue and self._active < self._limit(priority):
+                waiter = queue.popleft()
+                self._metrics[priority].queue_depth = len(queue)
+                if waiter.done():
+                    continue
+                self._active += 1
+                waiter.set_result(None)
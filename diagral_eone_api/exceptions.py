@@ -22,4 +22,11 @@ class TooManyRequestsError(DiagralCloudError):
 
 class MissingFieldResponseError(DiagralCloudError):
     """Exception raised when a field is missing in the response."""
-    
\ No newline at end of file
+    
+
+class DispatcherOverloadedError(DiagralCloudError):
+    """Exception raised when a request is rejected because the queue is full."""
+
+
+class ClientClosingError(DiagralCloudError):
+    """Exception raised when a request is made while the client is closing."""
@@ -0,0 +1,327 @@
+"""Bounded in-memory history of the system alert flags."""
+
+from __future__ import annotations
+
+import math
+import time
+from array import array
+from enum import Enum
+from typing import Callable, Dict, Optional, Tuple
+
+from .const import (CENTRAL_ALERT_FIELDS, HISTORY_ARCHIVE_CAPACITY,
+                    HISTORY_CAPACITY, HISTORY_DOWNSAMPLE_FACTOR,
+                    SENSOR_ALERT_FIELDS, TRANSMITTER_ALERT_FIELDS)
+from .models import GetSystemAlertsResponse
+
+_UNKNOWN = -1
+
+
+def _encode(value: Optional[bool]) -> int:
+    """Encode an optional flag to fit in a signed char array."""
+    return _UNKNOWN if value is None else int(bool(value))
+
+
+def _bisect(size: int, key: Callable[[int], float], value: float, inclusive: bool = True) -> int:
+    """Return the number of sorted items whose key is lower than (or equal to) value."""
+    low, high = 0, size
+    while low < high:
+        middle = (low + high) // 2
+        if key(middle) < value or (inclusive and key(middle) == value):
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+class AlertSource(str, Enum):
+    """Part of the system an alert flag belongs to."""
+    CENTRAL = "central"
+    SENSOR = "sensor"
+    TRANSMITTER = "transmitter"
+
+
+class FlagHistory:
+    """Bounded history of a single alert flag.
+
+    Only value changes are stored: each run records its start time and value,
+    plus the number of transitions and seconds in alert before it, so queries
+    are binary searches over the runs. The arrays grow with the number of
+    runs up to capacity. Past it, the oldest downsample_factor runs are merged
+    into a bucket, and at most archive_capacity buckets are kept.
+    """
+
+    def __init__(
+        self,
+        capacity: int = HISTORY_CAPACITY,
+        archive_capacity: int = HISTORY_ARCHIVE_CAPACITY,
+        downsample_factor: int = HISTORY_DOWNSAMPLE_FACTOR,
+    ) -> None:
+        """Initialize the object."""
+        if capacity < 1 or archive_capacity < 1 or downsample_factor < 1:
+            raise ValueError("History capacities and downsample factor must be at least 1.")
+
+        self.capacity = capacity
+        self.archive_capacity = archive_capacity
+        self.downsample_factor = downsample_factor
+
+        self._starts = array("d")
+        self._values = array("b")
+        self._transitions_before = array("q")
+        self._alert_before = array("d")
+        self._head = 0
+        self._size = 0
+
+        self._bucket_starts = array("d")
+        self._bucket_ends = array("d")
+        self._bucket_transitions_before = array("q")
+        self._bucket_alert_before = array("d")
+        self._bucket_alert_seconds = array("d")
+        self._archive_head = 0
+        self._archive_size = 0
+
+        self._last_value = _UNKNOWN
+        self._last_known = _UNKNOWN
+        self._last_start = 0.0
+        self._last_transition: Optional[float] = None
+        self._transitions = 0
+        self._alert_seconds = 0.0
+
+    @property
+    def last_value(self) -> Optional[bool]:
+        """Return the latest recorded value."""
+        return None if self._last_value == _UNKNOWN else bool(self._last_value)
+
+    def append(self, timestamp: float, value: Optional[bool]) -> None:
+        """Record the flag value at the given time."""
+        encoded = _encode(value)
+        if self._size and encoded == self._last_value:
+            return
+
+        if self._size and self._last_value == 1:
+            self._alert_seconds += timestamp - self._last_start
+
+        transitions_before = self._transitions
+        if _UNKNOWN not in (encoded, self._last_known) and encoded != self._last_known:
+            self._transitions += 1
+            self._last_transition = timestamp
+        if encoded != _UNKNOWN:
+            self._last_known = encoded
+
+        if self._size == self.capacity:
+            self._evict(timestamp)
+
+        position = (self._head + self._size) % self.capacity
+        row = (timestamp, encoded, transitions_before, self._alert_seconds)
+        columns = (self._starts, self._values, self._transitions_before, self._alert_before)
+        for column, item in zip(columns, row):
+            if position == len(column):
+                column.append(item)
+            else:
+                column[position] = item
+        self._size += 1
+
+        self._last_value = encoded
+        self._last_start = timestamp
+
+    def last_transition(self) -> Optional[float]:
+        """Return the time of the latest value change."""
+        return self._last_transition
+
+    def flap_count(self, since: Optional[float] = None) -> int:
+        """Return the number of value changes since the given time.
+
+        Downsampled data is counted with the resolution of its buckets.
+        """
+        return self._transitions - self._transitions_until(-math.inf if since is None else since)
+
+    def alert_duration(self, since: Optional[float] = None, until: Optional[float] = None) -> float:
+        """Return the time spent in alert between since and until, in seconds.
+
+        A value holds until the next change. Downsampled data is prorated over
+        its bucket.
+        """
+        since = -math.inf if since is None else since
+        until = time.time() if until is None else until
+        if until <= since:
+            return 0.0
+        return self._alert_until(until) - self._alert_until(since)
+
+    def _run(self, offset: int) -> int:
+        """Return the array position of a run, oldest first."""
+        return (self._head + offset) % self.capacity
+
+    def _bucket(self, offset: int) -> int:
+        """Return the array position of a bucket, oldest first."""
+        return (self._archive_head + offset) % self.archive_capacity
+
+    def _transitions_until(self, timestamp: float) -> int:
+        """Return the number of transitions before the given time."""
+        if self._size and timestamp > self._starts[self._run(0)]:
+            before = _bisect(
+                self._size, lambda offset: self._starts[self._run(offset)], timestamp, inclusive=False
+            )
+            if before == self._size:
+                return self._transitions
+            return self._transitions_before[self._run(before)]
+
+        # Buckets ending after timestamp are counted as a whole.
+        ended = _bisect(
+            self._archive_size, lambda offset: self._bucket_ends[self._bucket(offset)], timestamp
+        )
+        if ended < self._archive_size:
+            return self._bucket_transitions_before[self._bucket(ended)]
+        if self._size:
+            return self._transitions_before[self._run(0)]
+        return self._transitions
+
+    def _alert_until(self, timestamp: float) -> float:
+        """Return the seconds spent in alert before the given time."""
+        if self._size and timestamp >= self._starts[self._run(0)]:
+            offset = _bisect(
+                self._size, lambda offset: self._starts[self._run(offset)], timestamp
+            ) - 1
+            position = self._run(offset)
+            seconds = self._alert_before[position]
+            if self._values[position] == 1:
+                seconds += timestamp - self._starts[position]
+            return seconds
+
+        started = _bisect(
+            self._archive_size, lambda offset: self._bucket_starts[self._bucket(offset)], timestamp
+        )
+        if started == 0:
+            if self._archive_size:
+                return self._bucket_alert_before[self._bucket(0)]
+            return self._alert_before[self._run(0)] if self._size else 0.0
+
+        position = self._bucket(started - 1)
+        start = self._bucket_starts[position]
+        end = self._bucket_ends[position]
+        ratio = 1.0 if end <= start else min(1.0, (timestamp - start) / (end - start))
+        return self._bucket_alert_before[position] + self._bucket_alert_seconds[position] * ratio
+
+    def _evict(self, timestamp: float) -> None:
+        """Merge the oldest runs into a bucket of the archive."""
+        count = min(self.downsample_factor, self._size)
+        first = self._run(0)
+        # The bucket lasts until the next run, or the run being appended.
+        if count < self._size:
+            following = self._run(count)
+            end = self._starts[following]
+            alert_end = self._alert_before[following]
+        else:
+            end = timestamp
+            alert_end = self._alert_seconds
+
+        if self._archive_size == self.archive_capacity:
+            self._archive_head = (self._archive_head + 1) % self.archive_capacity
+            self._archive_size -= 1
+
+        position = self._bucket(self._archive_size)
+        row = (
+            self._starts[first],
+            end,
+            self._transitions_before[first],
+            self._alert_before[first],
+            alert_end - self._alert_before[first],
+        )
+        columns = (
+            self._bucket_starts,
+            self._bucket_ends,
+            self._bucket_transitions_before,
+            self._bucket_alert_before,
+            self._bucket_alert_seconds,
+        )
+        for column, item in zip(columns, row):
+            if position == len(column):
+                column.append(item)
+            else:
+                column[position] = item
+        self._archive_size += 1
+
+        self._head = (self._head + count) % self.capacity
+        self._size -= count
+
+
+class SystemAlertHistory:
+    """Alert flags history of one alarm system."""
+
+    def __init__(
+        self,
+        system_id: int,
+        capacity: int = HISTORY_CAPACITY,
+        archive_capacity: int = HISTORY_ARCHIVE_CAPACITY,
+        downsample_factor: int = HISTORY_DOWNSAMPLE_FACTOR,
+    ) -> None:
+        """Initialize the object."""
+        self.system_id = system_id
+        self.capacity = capacity
+        self.archive_capacity = archive_capacity
+        self.downsample_factor = downsample_factor
+        self._series: Dict[Tuple[AlertSource, Optional[int], str], FlagHistory] = {}
+
+    def record(self, response: GetSystemAlertsResponse, timestamp: Optional[float] = None) -> None:
+        """Record the flags of a system alerts response.
+
+        Sensor and transmitter statuses without a valid index are skipped.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+
+        for name in CENTRAL_ALERT_FIELDS:
+            self._append(AlertSource.CENTRAL, None, name, timestamp,
+                         getattr(response.central_status, name))
+
+        for status in response.sensors_status:
+            if status.index is None:
+                continue
+            for name in SENSOR_ALERT_FIELDS:
+                self._append(AlertSource.SENSOR, status.index, name, timestamp,
+                             getattr(status, name))
+
+        for status in response.transmitters_status:
+            if status.index is None:
+                continue
+            for name in TRANSMITTER_ALERT_FIELDS:
+                self._append(AlertSource.TRANSMITTER, status.index, name, timestamp,
+                             getattr(status, name))
+
+    def get(self, source: AlertSource, flag: str, index: Optional[int] = None) -> Optional[FlagHistory]:
+        """Return the history of a flag, index is None for the central."""
+        return self._series.get((source, index, flag))
+
+    def flap_count(
+        self, source: AlertSource, flag: str, index: Optional[int] = None, since: Optional[float] = None
+    ) -> int:
+        """Return the number of value changes of a flag since the given time."""
+        history = self.get(source, flag, index)
+        return 0 if history is None else history.flap_count(since)
+
+    def last_transition(
+        self, source: AlertSource, flag: str, index: Optional[int] = None
+    ) -> Optional[float]:
+        """Return the time of the latest value change of a flag."""
+        history = self.get(source, flag, index)
+        return None if history is None else history.last_transition()
+
+    def alert_duration(
+        self,
+        source: AlertSource,
+        flag: str,
+        index: Optional[int] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> float:
+        """Return the time a flag spent in alert between since and until, in seconds."""
+        history = self.get(source, flag, index)
+        return 0.0 if history is None else history.alert_duration(since, until)
+
+    def _append(
+        self, source: AlertSource, index: Optional[int], flag: str, timestamp: float, value: Optional[bool]
+    ) -> None:
+        """Append a flag value to its history, creating it if needed."""
+        key = (source, index, flag)
+        history = self._series.get(key)
+        if history is None:
+            history = FlagHistory(self.capacity, self.archive_capacity, self.downsample_factor)
+            self._series[key] = history
+        history.append(timestamp, value)
@@ -3,10 +3,17 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from .exceptions import MissingFieldResponseError
 
+def _parse_index(value: Any) -> Optional[int]:
+    """Convert a device index to int, None if it is missing or invalid."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
 @dataclass
 class LoginResponse:
     """Describe the Login response."""
@@ -279,23 +286,43 @@ class GetSystemStateResponse:
         )
 
 @dataclass
-class GetDevicesResponse:
-    """Describe the GetDevices response."""
-    index: Optional[str]
+class Device:
+    """Describe a device registered on the system."""
+    index: Optional[int]
     name: Optional[str]
     type: Optional[str]
     application: Optional[str]
 
     @staticmethod
-    def from_dict(data: Dict[str, Any]) -> 'GetDevicesResponse':
+    def from_dict(data: Dict[str, Any]) -> 'Device':
         """Convert the dictionnary to response object."""
-        return GetDevicesResponse(
-            index=data.get("index"),
+        return Device(
+            index=_parse_index(data.get("index")),
             name=data.get("name"),
             type=data.get("type"),
             application=data.get("application")
         )
 
+@dataclass
+class GetDevicesResponse:
+    """Describe the GetDevices response."""
+    devices: List[Device] = field(default_factory=list)
+
+    @staticmethod
+    def from_dict(data: Any) -> 'GetDevicesResponse':
+        """Convert the dictionnary (or list of dictionnaries) to response object."""
+
+        if isinstance(data, list):
+            devices_data = data
+        elif data:
+            devices_data = [data]
+        else:
+            devices_data = []
+
+        return GetDevicesResponse(
+            devices=[Device.from_dict(device) for device in devices_data]
+        )
+
 @dataclass
 class CentralStatus:
     """The alarm central status."""
@@ -351,7 +378,7 @@ class CommandStatus:
             secondary_power_supply_alert=data.get("secondaryPowerSupplyAlert"),
             autoprotection_mechanical_alert=data.get("autoprotectionMechanicalAlert"),
             radio_alert=data.get("radioAlert"),
-            index=data.get("index")
+            index=_parse_index(data.get("index"))
         )
 
 @dataclass
@@ -379,7 +406,7 @@ class TransmitterStatus:
             secondary_power_supply_alert=data.get("secondaryPowerSupplyAlert"),
             autoprotection_mechanical_alert=data.get("autoprotectionMechanicalAlert"),
             radio_alert=data.get("radioAlert"),
-            index=data.get("index")
+            index=_parse_index(data.get("index"))
         )
 
 @dataclass
@@ -409,7 +436,7 @@ class SensorStatus:
             mask_alert=data.get("maskAlert"),
             ejected=data.get("ejected"),
             number_of_supervisions=data.get("numberOfSupervisions"),
-            index=data.get("index")
+            index=_parse_index(data.get("index"))
         )
 
 @dataclass
@@ -447,3 +474,19 @@ class LogoutResponse:
         return LogoutResponse(
             status=status
         )
+
+@dataclass
+class DrainResult:
+    """Describe the outcome of a client drain."""
+    cancelled_requests: int = 0
+    failed_ttm_sessions: Dict[Tuple[int, str], BaseException] = field(default_factory=dict)
+    failed_account_sessions: Dict[str, BaseException] = field(default_factory=dict)
+
+    @property
+    def success(self) -> bool:
+        """Return True if every request finished and every session was closed."""
+        return (
+            self.cancelled_requests == 0
+            and not self.failed_ttm_sessions
+            and not self.failed_account_sessions
+        )
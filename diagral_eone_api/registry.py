@@ -0,0 +1,166 @@
+"""Per-system device registry joined with the alert status."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from .const import (COMMAND_ALERT_FIELDS, DEVICE_TYPE_COMMAND,
+                    DEVICE_TYPE_SENSOR, SENSOR_ALERT_FIELDS)
+from .models import (CommandStatus, Device, GetDevicesResponse,
+                     GetSystemAlertsResponse, SensorStatus)
+
+# Sensors and commands are numbered separately, a device is identified by its type and index.
+DeviceKey = Tuple[Optional[str], int]
+
+
+def is_alerting(status: Union[SensorStatus, CommandStatus]) -> bool:
+    """Return True if any alert flag of the status is raised."""
+    fields = SENSOR_ALERT_FIELDS if isinstance(status, SensorStatus) else COMMAND_ALERT_FIELDS
+    return any(getattr(status, name, None) for name in fields)
+
+
+@dataclass
+class RegisteredDevice:
+    """A device joined with its latest alert status."""
+    device_type: Optional[str]
+    index: int
+    device: Optional[Device]
+    sensor_status: Optional[SensorStatus]
+    command_status: Optional[CommandStatus]
+
+    @property
+    def is_alerting(self) -> bool:
+        """Return True if the device sensor or command status has an alert."""
+        return any(
+            status is not None and is_alerting(status)
+            for status in (self.sensor_status, self.command_status)
+        )
+
+
+class DeviceRegistry:
+    """Devices of one alarm system, indexed by type and index.
+
+    Sensor statuses are joined to the DEVICE_TYPE_SENSOR devices and command
+    statuses to the DEVICE_TYPE_COMMAND devices with the same index.
+    """
+
+    def __init__(self, system_id: int) -> None:
+        """Initialize the object."""
+        self.system_id = system_id
+        self._devices: Dict[DeviceKey, Device] = {}
+        self._by_type: Dict[Optional[str], Dict[int, Device]] = {}
+        self._sensors_status: Dict[int, SensorStatus] = {}
+        self._commands_status: Dict[int, CommandStatus] = {}
+        self._alerting: Set[DeviceKey] = set()
+
+    def __len__(self) -> int:
+        """Return the number of registered devices."""
+        return len(self._devices)
+
+    def __contains__(self, key: DeviceKey) -> bool:
+        """Return True if a device with this type and index is registered."""
+        return key in self._devices
+
+    def update_devices(self, response: GetDevicesResponse) -> Set[DeviceKey]:
+        """Refresh the devices from a GetDevices response.
+
+        Only added, changed and removed devices are touched. Return the keys
+        of those devices.
+        """
+        received: Dict[DeviceKey, Device] = {
+            (device.type, device.index): device
+            for device in response.devices
+            if device.index is not None
+        }
+        changed: Set[DeviceKey] = set()
+
+        for key in self._devices.keys() - received.keys():
+            self._remove_device(key)
+            changed.add(key)
+
+        for key, device in received.items():
+            if self._devices.get(key) == device:
+                continue
+            self._devices[key] = device
+            self._by_type.setdefault(device.type, {})[device.index] = device
+            changed.add(key)
+
+        return changed
+
+    def update_alerts(self, response: GetSystemAlertsResponse) -> Set[DeviceKey]:
+        """Refresh the sensors and commands status from a system alerts response.
+
+        Return the keys whose status changed.
+        """
+        changed = {
+            (DEVICE_TYPE_SENSOR, index)
+            for index in self._merge_status(self._sensors_status, response.sensors_status)
+        }
+        changed |= {
+            (DEVICE_TYPE_COMMAND, index)
+            for index in self._merge_status(self._commands_status, response.commands_status)
+        }
+
+        for key in changed:
+            if self.get(*key).is_alerting:
+                self._alerting.add(key)
+            else:
+                self._alerting.discard(key)
+
+        return changed
+
+    def get(self, device_type: Optional[str], index: int) -> RegisteredDevice:
+        """Return the device with this type and index joined with its alert status."""
+        return RegisteredDevice(
+            device_type=device_type,
+            index=index,
+            device=self._devices.get((device_type, index)),
+            sensor_status=(
+                self._sensors_status.get(index) if device_type == DEVICE_TYPE_SENSOR else None
+            ),
+            command_status=(
+                self._commands_status.get(index) if device_type == DEVICE_TYPE_COMMAND else None
+            ),
+        )
+
+    def get_device(self, device_type: Optional[str], index: int) -> Optional[Device]:
+        """Return the device with this type and index."""
+        return self._devices.get((device_type, index))
+
+    def get_by_type(self, device_type: str) -> List[Device]:
+        """Return the devices of this type."""
+        return list(self._by_type.get(device_type, {}).values())
+
+    def alerting_devices(self) -> List[RegisteredDevice]:
+        """Return the registered devices currently in alert."""
+        return [self.get(*key) for key in sorted(self._alerting) if key in self._devices]
+
+    def _remove_device(self, key: DeviceKey) -> None:
+        """Remove a device from the indexes."""
+        device_type, index = key
+        del self._devices[key]
+        same_type = self._by_type.get(device_type)
+        if same_type is not None:
+            same_type.pop(index, None)
+            if not same_type:
+                del self._by_type[device_type]
+
+    @staticmethod
+    def _merge_status(
+        current: Dict[int, Union[SensorStatus, CommandStatus]],
+        statuses: List[Union[SensorStatus, CommandStatus]],
+    ) -> Set[int]:
+        """Merge the received statuses into the current ones, return the changed indexes."""
+        received = {status.index: status for status in statuses if status.index is not None}
+        changed: Set[int] = set(current.keys() - received.keys())
+
+        for index in changed:
+            del current[index]
+
+        for index, status in received.items():
+            if current.get(index) != status:
+                current[index] = status
+                changed.add(index)
+
+        return changed
@@ -1,9 +1,15 @@
 
 """API test class."""
 
+import asyncio
+
+import pytest
+from aiohttp import ClientSession, web
 from faker import Faker
 
 from diagral_eone_api.client import DiagralEOneApi
+from diagral_eone_api.exceptions import (AuthorizationError, ClientClosingError,
+                                         CloudConnectionError)
 
 class TestApi:
     """API test."""
@@ -16,3 +22,132 @@ class TestApi:
         diagral_api = DiagralEOneApi(self.username, self.password, None)
         assert diagral_api.username == self.username
         assert diagral_api.password == self.password
+
+    @pytest.mark.asyncio
+    async def test_api_drain(self, mocker):
+        """Test drain closes the open sessions and rejects new requests."""
+        diagral_api = DiagralEOneApi(self.username, self.password, None)
+        responses = {
+            "login": {"sessionId": "session", "diagralId": "diagral"},
+            "connect": {"ttmSessionId": "ttm", "systemState": "off", "status": "OK"},
+            "disconnect": {"status": "OK"},
+        }
+
+        async def api_request(method, url, data=None, bearer_token=None):
+            endpoint = url.rsplit("/", 1)[-1]
+            if endpoint == "logout":
+                raise CloudConnectionError("unreachable")
+            return responses[endpoint]
+
+        request = mocker.patch.object(diagral_api, "_api_request", side_effect=api_request)
+
+        await diagral_api.login()
+        await diagral_api.connect("session", "1234", "transmitter", 1, 0)
+        result = await diagral_api.drain()
+
+        assert not result.success
+        assert result.failed_ttm_sessions == {}
+        assert list(result.failed_account_sessions) == ["session"]
+        assert request.call_args_list[2].args[1].endswith("/authenticate/disconnect")
+
+        with pytest.raises(ClientClosingError):
+            await diagral_api.get_systems("session")
+
+    @pytest.mark.asyncio
+    async def test_api_drain_forgets_dead_sessions(self, mocker):
+        """Test drain skips expired and unauthorized sessions."""
+        diagral_api = DiagralEOneApi(self.username, self.password, None)
+        logins = iter(["expired", "revoked", "valid"])
+
+        async def api_request(method, url, data=None, bearer_token=None):
+            endpoint = url.rsplit("/", 1)[-1]
+            if endpoint == "login":
+                session_id = next(logins)
+                expires_in = 0 if session_id == "expired" else 3600000
+                return {"sessionId": session_id, "diagralId": "diagral", "expiresIn": expires_in}
+            if endpoint == "connect":
+                return {"ttmSessionId": f"ttm-{bearer_token}", "systemState": "off", "status": "OK"}
+            if bearer_token == "revoked":
+                raise AuthorizationError("unauthorized")
+            return {"status": "OK", "systems": [], "diagralId": "diagral"}
+
+        request = mocker.patch.object(diagral_api, "_api_request", side_effect=api_request)
+
+        await diagral_api.login()
+        await diagral_api.login()
+        await diagral_api.connect("revoked", "1234", "transmitter", 1, 0)
+        with pytest.raises(AuthorizationError):
+            await diagral_api.get_systems("revoked")
+        await diagral_api.login()
+        request.reset_mock()
+        result = await diagral_api.drain()
+
+        assert result.success
+        assert [call.args[3] for call in request.call_args_list] == ["valid"]
+
+    @pytest.mark.asyncio
+    async def test_api_drain_cancels_overdue_requests(self, mocker):
+        """Test drain cancels the requests still running after the timeout."""
+        diagral_api = DiagralEOneApi(self.username, self.password, None)
+        started = asyncio.Event()
+
+        async def api_request(method, url, data=None, bearer_token=None):
+            started.set()
+            await asyncio.sleep(3600)
+
+        mocker.patch.object(diagral_api, "_api_request", side_effect=api_request)
+
+        slow = asyncio.create_task(diagral_api.get_systems("session"))
+        await started.wait()
+        result = await diagral_api.drain(request_timeout=0)
+
+        assert result.cancelled_requests == 1
+        assert not diagral_api._in_flight
+        with pytest.raises(ClientClosingError):
+            await slow
+
+    @pytest.mark.asyncio
+    async def test_api_shared_session_bearer_token(self):
+        """Test each request over a shared session only carries its own token."""
+        tokens = iter(["first", "second"])
+        received = []
+
+        async def handler(request):
+            authorization = request.headers.getall("Authorization", [])
+            received.append((request.path.rsplit("/", 1)[-1], authorization))
+            if request.path.endswith("/login"):
+                return web.json_response({"sessionId": next(tokens), "diagralId": "diagral"})
+            if authorization == ["Bearer second"] and request.path.endswith("/getSystems"):
+                return web.json_response({}, status=401)
+            return web.json_response({"status": "OK", "diagralId": "diagral"})
+
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+
+        try:
+            async with ClientSession() as session:
+                diagral_api = DiagralEOneApi(self.username, self.password, session)
+                diagral_api.base_url = f"http://127.0.0.1:{port}"
+
+                await diagral_api.login()
+                await diagral_api.login()
+                await diagral_api.get_systems("first")
+                with pytest.raises(AuthorizationError):
+                    await diagral_api.get_systems("second")
+                result = await diagral_api.drain()
+        finally:
+            await runner.cleanup()
+
+        assert result.success
+        assert received == [
+            ("login", []),
+            ("login", []),
+            ("getSystems", ["Bearer first"]),
+            ("getSystems", ["Bearer second"]),
+            ("logout", ["Bearer first"]),
+        ]
@@ -0,0 +1,83 @@
+"""Request dispatcher test class."""
+
+import asyncio
+
+import pytest
+
+from diagral_eone_api.dispatcher import Priority, RequestDispatcher
+from diagral_eone_api.exceptions import DispatcherOverloadedError
+
+class TestRequestDispatcher:
+    """Request dispatcher test."""
+
+    @pytest.mark.asyncio
+    async def test_interactive_jumps_queue(self):
+        """Test queued interactive requests are served before background ones."""
+        dispatcher = RequestDispatcher(max_concurrency=1, reserved_interactive=0)
+        release = asyncio.Event()
+        order = []
+
+        async def request(name):
+            order.append(name)
+            await release.wait()
+
+        first = asyncio.create_task(dispatcher.run(Priority.BACKGROUND, lambda: request("first")))
+        await asyncio.sleep(0)
+        background = asyncio.create_task(dispatcher.run(Priority.BACKGROUND, lambda: request("background")))
+        interactive = asyncio.create_task(dispatcher.run(Priority.INTERACTIVE, lambda: request("interactive")))
+        await asyncio.sleep(0)
+
+        metrics = dispatcher.metrics()
+        assert metrics[Priority.BACKGROUND].queue_depth == 1
+        assert metrics[Priority.INTERACTIVE].queue_depth == 1
+
+        release.set()
+        await asyncio.gather(first, background, interactive)
+        assert order == ["first", "interactive", "background"]
+        assert dispatcher.active == 0
+        metrics = dispatcher.metrics()
+        assert metrics[Priority.INTERACTIVE].dispatched == 1
+        assert metrics[Priority.BACKGROUND].queue_depth == 0
+
+    @pytest.mark.asyncio
+    async def test_background_shed(self):
+        """Test background requests are rejected when their queue is full."""
+        dispatcher = RequestDispatcher(
+            max_concurrency=2, reserved_interactive=1, background_queue_size=0
+        )
+        release = asyncio.Event()
+
+        running = asyncio.create_task(dispatcher.run(Priority.BACKGROUND, release.wait))
+        await asyncio.sleep(0)
+
+        with pytest.raises(DispatcherOverloadedError):
+            await dispatcher.run(Priority.BACKGROUND, release.wait)
+        assert dispatcher.metrics()[Priority.BACKGROUND].shed == 1
+
+        # The reserved slot is still available to interactive requests.
+        async def interactive():
+            return "done"
+
+        assert await dispatcher.run(Priority.INTERACTIVE, interactive) == "done"
+        release.set()
+        await running
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """Test queue depth drops when a queued request is cancelled."""
+        dispatcher = RequestDispatcher(max_concurrency=1, reserved_interactive=0)
+        release = asyncio.Event()
+
+        running = asyncio.create_task(dispatcher.run(Priority.BACKGROUND, release.wait))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(dispatcher.run(Priority.BACKGROUND, release.wait))
+        await asyncio.sleep(0)
+        assert dispatcher.metrics()[Priority.BACKGROUND].queue_depth == 1
+
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert dispatcher.metrics()[Priority.BACKGROUND].queue_depth == 0
+
+        release.set()
+        await running
@@ -0,0 +1,85 @@
+"""Alert history test class."""
+
+from diagral_eone_api.history import AlertSource, FlagHistory, SystemAlertHistory
+from diagral_eone_api.models import GetSystemAlertsResponse
+
+class TestFlagHistory:
+    """Flag history test."""
+
+    def test_queries(self):
+        """Test flap count, last transition and alert duration."""
+        history = FlagHistory(capacity=8)
+        for timestamp, value in [(0, False), (10, True), (20, True), (30, False), (40, True)]:
+            history.append(timestamp, value)
+
+        assert history.last_value is True
+        assert history.flap_count() == 3
+        assert history.flap_count(since=25) == 2
+        assert history.last_transition() == 40
+        assert history.alert_duration(until=50) == 30
+
+    def test_downsampling(self):
+        """Test memory stays bounded and old data is downsampled."""
+        history = FlagHistory(capacity=4, archive_capacity=2, downsample_factor=2)
+        for timestamp in range(100):
+            history.append(timestamp, timestamp % 2 == 1)
+
+        # 4 recent runs and 2 buckets of 2 runs, all of them transitions.
+        assert history.flap_count() == 8
+        assert history.alert_duration(since=96, until=100) == 2
+        assert history.last_transition() == 99
+
+        history = FlagHistory(capacity=2, archive_capacity=4, downsample_factor=2)
+        for timestamp, value in [(0, False), (1, True), (2, True), (3, True), (4, True)]:
+            history.append(timestamp, value)
+        assert history.last_transition() == 1
+
+    def test_unchanged_values(self):
+        """Test repeated values do not use the history capacity."""
+        history = FlagHistory(capacity=2, archive_capacity=1, downsample_factor=1)
+        history.append(0, False)
+        history.append(10, True)
+        for timestamp in range(20, 100000, 10):
+            history.append(timestamp, True)
+        history.append(100000, False)
+
+        assert history.flap_count() == 2
+        assert history.flap_count(since=20) == 1
+        assert history.last_transition() == 100000
+        assert history.alert_duration(until=200000) == 99990
+
+
+class TestSystemAlertHistory:
+    """System alert history test."""
+
+    def test_record(self):
+        """Test flags are recorded per source and index."""
+        history = SystemAlertHistory(1)
+        for timestamp, radio_alert in [(0, False), (60, True), (120, False)]:
+            history.record(GetSystemAlertsResponse.from_dict({
+                "centralStatus": {
+                    "systemState": 0, "systemStateText": "off", "activeGroups": {},
+                    "mainPowerSupplyAlert": False,
+                },
+                "sensorsStatus": [{"index": 3, "radioAlert": radio_alert}],
+            }), timestamp)
+
+        assert history.flap_count(AlertSource.SENSOR, "radio_alert", 3) == 2
+        assert history.last_transition(AlertSource.SENSOR, "radio_alert", 3) == 120
+        assert history.alert_duration(AlertSource.SENSOR, "radio_alert", 3, until=180) == 60
+        assert history.last_transition(AlertSource.CENTRAL, "main_power_supply_alert") is None
+        assert history.flap_count(AlertSource.TRANSMITTER, "radio_alert", 1) == 0
+
+    def test_record_skips_missing_index(self):
+        """Test statuses without a valid index are not recorded."""
+        history = SystemAlertHistory(1)
+        for timestamp in range(0, 300, 60):
+            history.record(GetSystemAlertsResponse.from_dict({
+                "centralStatus": {"systemState": 0, "systemStateText": "off", "activeGroups": {}},
+                "sensorsStatus": [{"radioAlert": True}, {"index": "x", "radioAlert": False}],
+                "transmittersStatus": [{"radioAlert": True}],
+            }), timestamp)
+
+        assert history.get(AlertSource.SENSOR, "radio_alert", None) is None
+        assert history.get(AlertSource.TRANSMITTER, "radio_alert", None) is None
+        assert history.flap_count(AlertSource.SENSOR, "radio_alert", None) == 0
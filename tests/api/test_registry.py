@@ -0,0 +1,89 @@
+"""Device registry test class."""
+
+from diagral_eone_api.models import GetDevicesResponse, GetSystemAlertsResponse
+from diagral_eone_api.registry import DeviceRegistry
+
+CENTRAL_STATUS = {"systemState": 0, "systemStateText": "off", "activeGroups": {}}
+
+class TestDeviceRegistry:
+    """Device registry test."""
+
+    def test_update_devices(self):
+        """Test devices are indexed by type and index."""
+        registry = DeviceRegistry(1)
+        changed = registry.update_devices(GetDevicesResponse.from_dict([
+            {"index": "1", "name": "Door", "type": "SENSOR"},
+            {"index": "2", "name": "Remote", "type": "COMMAND"},
+            {"index": "x", "name": "Unknown", "type": "SENSOR"},
+        ]))
+        assert changed == {("SENSOR", 1), ("COMMAND", 2)}
+        assert registry.get_device("SENSOR", 1).name == "Door"
+        assert [device.name for device in registry.get_by_type("COMMAND")] == ["Remote"]
+
+        changed = registry.update_devices(GetDevicesResponse.from_dict([
+            {"index": "1", "name": "Front door", "type": "SENSOR"},
+        ]))
+        assert changed == {("SENSOR", 1), ("COMMAND", 2)}
+        assert ("COMMAND", 2) not in registry
+        assert registry.get_by_type("COMMAND") == []
+        assert registry.get_device("SENSOR", 1).name == "Front door"
+
+    def test_alerting_devices(self):
+        """Test devices are joined with their sensor status."""
+        registry = DeviceRegistry(1)
+        registry.update_devices(GetDevicesResponse.from_dict([
+            {"index": "1", "name": "Door", "type": "SENSOR"},
+            {"index": "2", "name": "Window", "type": "SENSOR"},
+        ]))
+        registry.update_alerts(GetSystemAlertsResponse.from_dict({
+            "centralStatus": CENTRAL_STATUS,
+            "sensorsStatus": [{"index": "1", "radioAlert": False}, {"index": "2", "radioAlert": True}],
+        }))
+        assert [item.device.name for item in registry.alerting_devices()] == ["Window"]
+
+        changed = registry.update_alerts(GetSystemAlertsResponse.from_dict({
+            "centralStatus": CENTRAL_STATUS,
+            "sensorsStatus": [{"index": 1, "radioAlert": False}, {"index": 2, "radioAlert": False}],
+        }))
+        assert changed == {("SENSOR", 2)}
+        assert registry.alerting_devices() == []
+
+    def test_sensor_and_command_share_index(self):
+        """Test sensor and command statuses are joined to their own device kind."""
+        registry = DeviceRegistry(1)
+        registry.update_devices(GetDevicesResponse.from_dict([
+            {"index": "1", "name": "Door", "type": "SENSOR"},
+            {"index": "1", "name": "Remote", "type": "COMMAND"},
+        ]))
+        assert len(registry) == 2
+
+        registry.update_alerts(GetSystemAlertsResponse.from_dict({
+            "centralStatus": CENTRAL_STATUS,
+            "sensorsStatus": [{"index": 1, "radioAlert": False}],
+            "commandsStatus": [{"index": 1, "radioAlert": True}],
+        }))
+        alerting = registry.alerting_devices()
+        assert [item.device.name for item in alerting] == ["Remote"]
+        assert alerting[0].sensor_status is None
+        assert registry.get("SENSOR", 1).command_status is None
+        assert not registry.get("SENSOR", 1).is_alerting
+
+    def test_removed_device_not_alerting(self):
+        """Test a device removed while in alert is no longer reported."""
+        registry = DeviceRegistry(1)
+        registry.update_devices(GetDevicesResponse.from_dict([
+            {"index": "1", "name": "Door", "type": "SENSOR"},
+        ]))
+        registry.update_alerts(GetSystemAlertsResponse.from_dict({
+            "centralStatus": CENTRAL_STATUS,
+            "sensorsStatus": [{"index": 1, "radioAlert": True}],
+        }))
+        assert [item.device.name for item in registry.alerting_devices()] == ["Door"]
+
+        registry.update_devices(GetDevicesResponse.from_dict([]))
+        assert registry.alerting_devices() == []
+
+        registry.update_devices(GetDevicesResponse.from_dict([
+            {"index": "1", "name": "Door", "type": "SENSOR"},
+        ]))
+        assert [item.device.name for item in registry.alerting_devices()] == ["Door"]